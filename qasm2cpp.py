@@ -11,6 +11,7 @@ Usage:
 """
 
 from __future__ import annotations
+import dataclasses
 import sys
 import openqasm3
 import openqasm3.ast as ast
@@ -255,12 +256,282 @@ class CppEmitter(QASMVisitor[None]):
         self.emit("")
         self._indent -= 1
         self.emit("}")
+
+        deferred = self._terminal_measurements(other_stmts, def_stmts)
+        if deferred:
+            self._emit_sample(other_stmts, deferred)
+
         self._indent -= 1
         self.emit("};")
         self.emit("")
         self.emit('extern "C" qasm::qasm* constructor() { return new userqasm(); }')
         return self.code()
 
+    # ---- 終端測定のみのプログラム → sample(shots)
+    @staticmethod
+    def _walk(node):
+        """AST ノードを深さ優先で列挙"""
+        if isinstance(node, list):
+            for n in node:
+                yield from CppEmitter._walk(n)
+            return
+        if not isinstance(node, ast.QASMNode):
+            return
+        yield node
+        for f in dataclasses.fields(node):
+            yield from CppEmitter._walk(getattr(node, f.name))
+
+    @staticmethod
+    def _qubit_key(q) -> tuple[str, int | None]:
+        """量子ビット参照 → (レジスタ名, 定数添字 | None=レジスタ全体/不定)"""
+        if isinstance(q, ast.Identifier):
+            return (q.name, None)
+        if isinstance(q, ast.IndexedIdentifier):
+            name, indices = q.name.name, q.indices
+        elif isinstance(q, ast.IndexExpression) and isinstance(q.collection, ast.Identifier):
+            name, indices = q.collection.name, [q.index]
+        else:
+            return (str(q), None)
+        if (len(indices) == 1 and isinstance(indices[0], list) and len(indices[0]) == 1
+                and isinstance(indices[0][0], ast.IntegerLiteral)):
+            return (name, indices[0][0].value)
+        return (name, None)
+
+    @staticmethod
+    def _overlaps(key: tuple[str, int | None], keys) -> bool:
+        name, idx = key
+        return any(n == name and (i is None or idx is None or i == idx) for n, i in keys)
+
+    @staticmethod
+    def _measured_qubit(s):
+        """トップレベルの測定文なら測定対象の量子ビットを返す"""
+        if isinstance(s, ast.QuantumMeasurementStatement):
+            return s.measure.qubit
+        if isinstance(s, ast.ClassicalDeclaration) and isinstance(s.init_expression, ast.QuantumMeasurement):
+            return s.init_expression.qubit
+        return None
+
+    @staticmethod
+    def _measured_bit(s) -> str | None:
+        """測定結果を受け取る古典レジスタ名 (無ければ None)"""
+        if isinstance(s, ast.ClassicalDeclaration):
+            return s.identifier.name
+        if isinstance(s.target, ast.IndexedIdentifier):
+            return s.target.name.name
+        if isinstance(s.target, ast.Identifier):
+            return s.target.name
+        return None
+
+    @staticmethod
+    def _literal_size(size) -> int | None:
+        """レジスタ幅: 省略 → 1, 整数リテラル → 値, それ以外 → None"""
+        if size is None:
+            return 1
+        if isinstance(size, ast.IntegerLiteral):
+            return size.value
+        return None
+
+    def _qubit_width(self, q, qsizes: dict[str, int | None]) -> int | None:
+        """測定対象の量子ビット数 (静的に決まらなければ None)"""
+        name, idx = self._qubit_key(q)
+        if idx is not None:
+            return 1
+        if isinstance(q, ast.Identifier):
+            return qsizes.get(name)
+        return None
+
+    def _def_touches(self, def_stmts: list) -> dict[str, set[tuple[str, int | None]]]:
+        """def 名 → 本体が (引数以外で) 作用する量子ビット。def 呼び出しも推移的に辿る"""
+        direct: dict[str, set[tuple[str, int | None]]] = {}
+        calls: dict[str, set[str]] = {}
+        for d in def_stmts:
+            params = getattr(d, "arguments", getattr(d, "parameters", []))
+            pnames = set()
+            for p in params:
+                pname = getattr(p, "name", getattr(p, "identifier", None))
+                pnames.add(pname.name if isinstance(pname, ast.Identifier) else pname)
+            keys: set[tuple[str, int | None]] = set()
+            callees: set[str] = set()
+            for n in self._walk(d.body):
+                if isinstance(n, ast.QuantumGate):
+                    keys.update(self._qubit_key(q) for q in n.qubits)
+                elif isinstance(n, ast.FunctionCall):
+                    callees.add(n.name.name)
+                    keys.update(self._qubit_key(a) for a in n.arguments
+                                if isinstance(a, (ast.Identifier, ast.IndexExpression)))
+            direct[d.name.name] = {k for k in keys if k[0] not in pnames}
+            calls[d.name.name] = callees
+
+        touches = {name: set(keys) for name, keys in direct.items()}
+        changed = True
+        while changed:                              # 再帰呼び出しに備えて不動点まで
+            changed = False
+            for name, callees in calls.items():
+                for c in callees & touches.keys():
+                    if not touches[c] <= touches[name]:
+                        touches[name] |= touches[c]
+                        changed = True
+        return touches
+
+    def _terminal_measurements(self, stmts: list, def_stmts: list) -> list:  # noqa: C901
+        """終端測定のみのプログラムなら (後回しにする) 測定文の一覧を返す。
+
+        測定後に同じ量子ビットへ作用する命令・制御構文内の測定・測定先レジスタの
+        測定以外での読み書きなどがあれば空リスト (= sample 非対応)。無関係な
+        量子ビットへのゲートは測定と可換なので、測定を末尾へ送っても意味は変わらない。
+        """
+        non_unitary = (ast.QuantumMeasurement, ast.QuantumReset, ast.AliasStatement)
+        if any(isinstance(n, non_unitary) for n in self._walk(def_stmts)):
+            return []
+        def_touches = self._def_touches(def_stmts)
+        classical = (*self._IF_NODES, *self._ASSIGN_NODES)
+
+        deferred: list = []
+        measured: list[tuple[str, int | None]] = []
+        touched: list[tuple[str, int | None]] = []
+        for s in stmts:
+            q = self._measured_qubit(s)
+            if q is not None:
+                key = self._qubit_key(q)
+                if self._overlaps(key, measured):
+                    return []                       # 再測定
+                measured.append(key)
+                deferred.append(s)
+                continue
+
+            nodes = list(self._walk(s))
+            if any(isinstance(n, (ast.QuantumMeasurement, ast.AliasStatement)) for n in nodes):
+                return []                           # 途中測定 / 別名
+            if isinstance(s, ast.QuantumReset):
+                # 未使用の量子ビットの初期化のみ決定論的
+                key = self._qubit_key(s.qubits)
+                if self._overlaps(key, touched) or self._overlaps(key, measured):
+                    return []
+                continue
+            if any(isinstance(n, ast.QuantumReset) for n in nodes):
+                return []
+
+            if measured:
+                # 測定後はゲート列と宣言のみ許す (ループ本体も含めて)
+                unitary = (ast.QuantumGate, ast.QuantumBarrier, ast.QubitDeclaration,
+                           ast.ClassicalDeclaration, *self._FOR_NODES)
+                if not isinstance(s, unitary):
+                    return []
+                for n in nodes:
+                    if isinstance(n, classical):
+                        return []
+                    if isinstance(n, ast.ClassicalDeclaration) and n.init_expression is not None:
+                        return []
+                    if isinstance(n, ast.FunctionCall) and n.name.name in def_touches:
+                        return []
+
+            for n in nodes:
+                if isinstance(n, ast.QuantumGate):
+                    keys = [self._qubit_key(q) for q in n.qubits]
+                elif isinstance(n, ast.FunctionCall) and n.name.name in def_touches:
+                    keys = [self._qubit_key(a) for a in n.arguments
+                            if isinstance(a, (ast.Identifier, ast.IndexExpression))]
+                    keys += def_touches[n.name.name]
+                else:
+                    continue
+                if any(self._overlaps(k, measured) for k in keys):
+                    return []
+                touched.extend(keys)
+
+        if not self._check_sample_targets(stmts, def_stmts, deferred):
+            return []
+        return deferred
+
+    def _check_sample_targets(self, stmts: list, def_stmts: list, deferred: list) -> bool:  # noqa: C901
+        """測定先が初期値なしの bit レジスタで、幅が測定対象と一致し、
+        測定文以外から一切読み書きされないことを確認する"""
+        bits = {b for b in map(self._measured_bit, deferred) if b is not None}
+        if not bits:
+            return False                            # 観測される結果が無い
+        deferred_ids = {id(s) for s in deferred}
+        qsizes = {s.qubit.name: self._literal_size(s.size)
+                  for s in stmts if isinstance(s, ast.QubitDeclaration)}
+
+        widths: dict[str, int] = {}
+        for s in stmts:
+            if isinstance(s, (ast.ClassicalDeclaration, ast.IODeclaration)) and s.identifier.name in bits:
+                if not isinstance(s.type, ast.BitType):
+                    return False
+                if (width := self._literal_size(s.type.size)) is None:
+                    return False
+                widths[s.identifier.name] = width
+                init = getattr(s, "init_expression", None)
+                if init is not None and id(s) not in deferred_ids:
+                    return False
+                if id(s) not in deferred_ids:
+                    continue
+            elif id(s) not in deferred_ids:
+                if any(isinstance(n, ast.Identifier) and n.name in bits for n in self._walk(s)):
+                    return False                    # 測定以外での読み書き
+                continue
+        if bits - widths.keys():
+            return False                            # 宣言が見当たらない
+        if any(isinstance(n, ast.Identifier) and n.name in bits for n in self._walk(def_stmts)):
+            return False
+
+        for s in deferred:
+            bit = self._measured_bit(s)
+            if bit is None:
+                continue
+            qwidth = self._qubit_width(self._measured_qubit(s), qsizes)
+            if qwidth is None:
+                return False
+            target = getattr(s, "target", None)
+            if isinstance(target, ast.IndexedIdentifier):
+                _, idx = self._qubit_key(target)
+                if qwidth != 1 or idx is None or not 0 <= idx < widths[bit]:
+                    return False
+            elif qwidth != widths[bit]:
+                return False
+        return True
+
+    def _emit_sample(self, stmts: list, deferred: list) -> None:
+        """ユニタリ部を一度だけ実行し、最終分布から shots 回分をまとめて測定する。
+
+        測定先の古典レジスタは shot ごとの結果を保持する samples として確保し、
+        レジスタ名 → samples の対応を返す。複数の測定文は量子ビット間の相関を
+        保つため 1 回の同時測定にまとめ、結果を各レジスタへ切り出す。
+        """
+        deferred_ids = {id(s) for s in deferred}
+        targeted = [s for s in deferred if self._measured_bit(s) is not None]
+        bits = list(dict.fromkeys(map(self._measured_bit, targeted)))
+        qsizes = {s.qubit.name: self._literal_size(s.size)
+                  for s in stmts if isinstance(s, ast.QubitDeclaration)}
+        self.emit("")
+        self.emit("std::map<std::string, qasm::samples> sample(unsigned int shots) {")
+        self._indent += 1
+        self.emit("using namespace qasm;")
+        self.emit("")
+        for s in stmts:
+            if isinstance(s, (ast.ClassicalDeclaration, ast.IODeclaration)) and s.identifier.name in bits:
+                self.emit(f"samples {s.identifier.name} = salloc({self._literal_size(s.type.size)}, shots);")
+            elif id(s) not in deferred_ids:
+                self.visit(s)
+
+        def lhs(s) -> str:
+            return s.identifier.name if isinstance(s, ast.ClassicalDeclaration) else self._qubit(s.target)
+
+        # 測定先の無い測定文は観測されないので sample では省く
+        if len(targeted) == 1:
+            s = targeted[0]
+            self.emit(f"{lhs(s)} = measure({self._qubit(self._measured_qubit(s))}, shots);")
+        else:
+            srcs = ", ".join(self._qubit(self._measured_qubit(s)) for s in targeted)
+            self.emit(f"samples __draw = measure({{{srcs}}}, shots);")
+            offset = 0
+            for s in targeted:
+                width = self._qubit_width(self._measured_qubit(s), qsizes)
+                self.emit(f"{lhs(s)} = __draw.bits({offset}, {width});")
+                offset += width
+        self.emit("return {" + ", ".join(f'{{"{b}", {b}}}' for b in bits) + "};")
+        self._indent -= 1
+        self.emit("}")
+
     # ---- gate 定義
     def visit_QuantumGateDefinition(self, node: GateDefNode):  # type: ignore[override]
         gname = node.name.name
@@ -0,0 +1,177 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+
+def _convert(tmp_path: Path, qasm: str) -> str:
+    qasm_file = tmp_path / "sample.qasm"
+    qasm_file.write_text(qasm)
+    result = subprocess.run(
+        [sys.executable, "qasm2cpp.py", str(qasm_file)],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr
+    return result.stdout
+
+
+def _sample_body(code: str) -> list[str]:
+    lines = code.splitlines()
+    start = next(i for i, line in enumerate(lines) if line.strip() == "std::map<std::string, qasm::samples> sample(unsigned int shots) {")
+    start = next(i for i, line in enumerate(lines[start:], start) if line.strip() == "using namespace qasm;") + 1
+    end = next(i for i, line in enumerate(lines[start:], start) if line.strip() == "}")
+    return [line.strip() for line in lines[start:end] if line.strip()]
+
+
+def test_terminal_measurement_emits_sample(tmp_path: Path):
+    code = _convert(tmp_path, """OPENQASM 3;
+qubit[2] q;
+bit[2] c;
+h q[0];
+ctrl @ x q[0], q[1];
+c = measure q;
+""")
+    assert "c = measure(q);" in code
+    assert _sample_body(code) == [
+        "qubits q = qalloc(2);",
+        "samples c = salloc(2, shots);",
+        "h()(q[0]);",
+        "(ctrl() * x())(q[0], q[1]);",
+        "c = measure(q, shots);",
+        'return {{"c", c}};',
+    ]
+
+
+def test_measurement_deferred_past_unrelated_gate(tmp_path: Path):
+    code = _convert(tmp_path, """OPENQASM 3;
+qubit[2] q;
+bit a = measure q[0];
+h q[1];
+bit b;
+b = measure q[1];
+""")
+    assert _sample_body(code) == [
+        "qubits q = qalloc(2);",
+        "samples a = salloc(1, shots);",
+        "h()(q[1]);",
+        "samples b = salloc(1, shots);",
+        "samples __draw = measure({q[0], q[1]}, shots);",
+        "a = __draw.bits(0, 1);",
+        "b = __draw.bits(1, 1);",
+        'return {{"a", a}, {"b", b}};',
+    ]
+
+
+def test_per_bit_measurements_sampled_jointly(tmp_path: Path):
+    code = _convert(tmp_path, """OPENQASM 3;
+qubit[2] q;
+bit[2] c;
+h q[0];
+ctrl @ x q[0], q[1];
+c[0] = measure q[0];
+c[1] = measure q[1];
+""")
+    assert _sample_body(code) == [
+        "qubits q = qalloc(2);",
+        "samples c = salloc(2, shots);",
+        "h()(q[0]);",
+        "(ctrl() * x())(q[0], q[1]);",
+        "samples __draw = measure({q[0], q[1]}, shots);",
+        "c[0] = __draw.bits(0, 1);",
+        "c[1] = __draw.bits(1, 1);",
+        'return {{"c", c}};',
+    ]
+
+
+def test_output_register_emits_sample(tmp_path: Path):
+    code = _convert(tmp_path, """OPENQASM 3;
+qubit[2] q;
+output bit[2] c;
+h q;
+c = measure q;
+""")
+    assert _sample_body(code) == [
+        "qubits q = qalloc(2);",
+        "samples c = salloc(2, shots);",
+        "h()(q);",
+        "c = measure(q, shots);",
+        'return {{"c", c}};',
+    ]
+
+
+def test_reset_of_fresh_qubit_after_nested_def(tmp_path: Path):
+    code = _convert(tmp_path, """OPENQASM 3;
+qubit[3] q;
+bit c;
+def g() { h q[0]; ctrl @ x q[0], q[1]; }
+def f() { g(); }
+f();
+reset q[2];
+c = measure q[1];
+""")
+    assert _sample_body(code) == [
+        "qubits q = qalloc(3);",
+        "samples c = salloc(1, shots);",
+        "f();",
+        "reset(q[2]);",
+        "c = measure(q[1], shots);",
+        'return {{"c", c}};',
+    ]
+
+
+def test_reset_after_allocation_emits_sample(tmp_path: Path):
+    code = _convert(tmp_path, """OPENQASM 3;
+include "stdgates.inc";
+qubit[2] q;
+bit[2] c;
+reset q;
+x q[0];
+h q[0];
+cphase(pi / 2) q[1], q[0];
+h q[1];
+c = measure q;
+""")
+    assert _sample_body(code) == [
+        "qubits q = qalloc(2);",
+        "samples c = salloc(2, shots);",
+        "reset(q);",
+        "x()(q[0]);",
+        "h()(q[0]);",
+        "cphase(M_PI / 2)(q[1], q[0]);",
+        "h()(q[1]);",
+        "c = measure(q, shots);",
+        'return {{"c", c}};',
+    ]
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        "qubit[2] q;\nbit c;\nc = measure q[0];\nh q[0];\n",
+        "qubit[2] q;\nbit c;\nc = measure q[0];\nif (c) x q[1];\n",
+        "qubit[2] q;\nbit[2] c;\nh q;\nreset q[0];\nc = measure q;\n",
+        "qubit q;\nh q;\n",
+        "qubit[2] q;\nbit c;\nc = measure q[0];\nrx(c) q[1];\nmeasure q[1];\n",
+        "qubit[2] q;\nbit c;\nc = measure q[0];\nfor int i in [0:1] { if (c) { x q[1]; } }\n",
+        "qubit[2] q;\nbit c;\nc = measure q[0];\nfor int i in [0:1] { c = 0; }\n",
+        "def f(qubit a) { h a; }\nqubit[2] q;\nbit[2] c;\nf(q[0]);\nreset q[0];\nc = measure q;\n",
+        "qubit[2] q;\nbit c;\ndef g() { h q[0]; ctrl @ x q[0], q[1]; }\n"
+        "def f() { g(); }\nf();\nreset q[0];\nc = measure q[1];\n",
+        "qubit[2] q;\nint[32] c;\nc = measure q;\n",
+        "qubit[2] q;\nbit[3] c;\nc = measure q;\n",
+        "qubit[2] q;\nbit[2] c;\nc[0] = 1;\nh q[1];\nc[1] = measure q[1];\n",
+        "qubit[2] q;\nbit[2] c = \"00\";\nh q;\nc = measure q;\n",
+    ],
+    ids=[
+        "gate-after-measure", "if-reads-bit", "reset-after-gate", "no-measurement",
+        "bit-as-gate-parameter", "bit-read-in-for", "bit-written-in-for",
+        "reset-after-def-call", "reset-after-nested-def-call", "non-bit-target",
+        "width-mismatch", "bit-written-before-measure", "bit-initialiser",
+    ],
+)
+def test_mid_circuit_measurement_has_no_sample(tmp_path: Path, body: str):
+    code = _convert(tmp_path, "OPENQASM 3;\n" + body)
+    assert "sample(unsigned int shots)" not in code